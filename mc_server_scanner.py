@@ -1,5 +1,6 @@
 print("Loading mc_server_scanner.py...")
 import socket
+import errno
 import threading
 import sys
 import time
@@ -36,6 +37,12 @@ MIN_THREAD = 1
 MAX_THREAD = 200
 FAST_TIMEOUT = 0.2
 SLOW_TIMEOUT = 1.0
+DEFAULT_SENTINEL_PORTS = [25565, 80, 443, 22]
+# 最后一个哨兵端口的超时：Windows 收到RST后会重发SYN，约1-2秒才报告连接被拒绝
+SENTINEL_TIMEOUT = SLOW_TIMEOUT if os.name == 'nt' else FAST_TIMEOUT
+DEFAULT_MULTI_PORTS = "25565-25575,19132"
+# connect_ex 返回这些错误码说明对方回了RST，主机存活但端口关闭
+ALIVE_ERRNOS = {errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", errno.ECONNREFUSED)}
 found_servers = []
 found_lock = threading.Lock()
 pause_flag = threading.Event()
@@ -46,6 +53,8 @@ current_target = 0
 counter_lock = threading.Lock()
 latest_scanned = "等待启动..."
 mc_scan_mode = False
+live_hosts = []
+prefilter_stats = {}
 
 def clear_input_buffer():
     """清空键盘输入缓冲区"""
@@ -215,13 +224,112 @@ def scan_single_ip_worker(ip, start_port, end_port, progress, task_id):
             current_target += 1
         scan_ip_port(ip, port, progress, task_id)
 
-def get_valid_input(prompt_text, input_type=str, validation=None):
-    """获取并验证用户输入"""
+def probe_sentinel(ip, port, timeout=FAST_TIMEOUT):
+    """探测单个哨兵端口，返回 "open"、"closed"(收到RST) 或 "dead"(无响应)"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(timeout)
+        try:
+            result = s.connect_ex((ip, port))
+        finally:
+            s.close()
+    except Exception:
+        return "dead"
+
+    if result == 0:
+        return "open"
+    if result in ALIVE_ERRNOS:
+        return "closed"
+    return "dead"
+
+def discover_host_worker(start_int, end_int, sentinel_ports, progress, task_id):
+    """存活探测工作线程：依次探测哨兵端口，收到SYN-ACK或RST即判定主机存活"""
+    global current_target, latest_scanned
+    while True:
+        pause_flag.wait()
+        with counter_lock:
+            if current_target > (end_int - start_int):
+                break
+            ip_num = start_int + current_target
+            current_target += 1
+        ip = int_to_ip(ip_num)
+        with counter_lock:
+            latest_scanned = ip
+
+        closed_ports = set()
+        alive = False
+        probes = 0
+        for idx, port in enumerate(sentinel_ports):
+            # 前面的哨兵用快速超时发现开放端口，最后一个留足时间等待RST
+            timeout = SENTINEL_TIMEOUT if idx == len(sentinel_ports) - 1 else FAST_TIMEOUT
+            state = probe_sentinel(ip, port, timeout)
+            probes += 1
+            if state == "closed":
+                closed_ports.add(port)
+            if state != "dead":
+                alive = True
+                break
+
+        with counter_lock:
+            prefilter_stats["sentinel_probes"] += probes
+            if alive:
+                live_hosts.append((ip, closed_ports))
+            else:
+                prefilter_stats["dead_probes"] += probes
+        progress.update(task_id, advance=1, current_target=latest_scanned)
+
+def scan_live_hosts_worker(hosts, ports, progress, task_id):
+    """存活主机的端口扫描工作线程，跳过哨兵阶段已确认关闭的端口"""
+    global current_target
+    total = len(hosts) * len(ports)
+    while True:
+        pause_flag.wait()
+        with counter_lock:
+            if current_target >= total:
+                break
+            host_idx, port_idx = divmod(current_target, len(ports))
+            current_target += 1
+        ip, closed_ports = hosts[host_idx]
+        port = ports[port_idx]
+        if port in closed_ports:
+            continue
+        scan_ip_port(ip, port, progress, task_id)
+
+def parse_port_list(text):
+    """解析端口列表，如 "25565-25575,19132"，返回去重后保持顺序的端口列表"""
+    ports = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            low, high = (int(x) for x in part.split('-', 1))
+            if low > high:
+                raise ValueError(part)
+            ports.extend(range(low, high + 1))
+        else:
+            ports.append(int(part))
+    if not ports or not all(validate_port(p) for p in ports):
+        raise ValueError(text)
+    return list(dict.fromkeys(ports))
+
+def validate_port_list(text):
+    """验证端口列表格式"""
+    try:
+        parse_port_list(text)
+        return True
+    except ValueError:
+        return False
+
+def get_valid_input(prompt_text, input_type=str, validation=None, default=None):
+    """获取并验证用户输入，输入为空且提供了default时返回default"""
     prompt = Text(prompt_text, style=INFO_STYLE)
     while True:
         try:
             user_input = input(prompt).strip()
             if not user_input:
+                if default is not None:
+                    return default
                 if input_type == int:
                     return None
                 else:
@@ -334,7 +442,8 @@ def show_menu():
         "1. IP范围扫描（指定端口）",
         "2. 单个主机端口扫描（支持域名和IP）",
         "3. MC服务器状态检测",
-        "4. 退出"
+        "4. 多端口IP范围扫描（存活预探测）",
+        "5. 退出"
     ]
     
     return get_arrow_key_selection("请选择扫描模式", menu_items) + 1
@@ -503,6 +612,134 @@ def single_ip_port_scan():
     
     show_scan_results()
 
+def multi_port_range_scan():
+    """多端口IP范围扫描模式 - 先用哨兵端口探测存活主机，仅对存活主机扫描全部端口"""
+    console.clear()
+    print_header()
+    console.print(Panel("多端口IP范围扫描模式（存活预探测）", border_style=BORDER_STYLE, style=TITLE_STYLE, width=PANEL_WIDTH))
+    console.print("\n")
+    
+    confirm_mc_mode()
+    
+    console.print("\n请输入以下信息（按回车键确认）\n")
+    
+    start_ip = get_valid_input("请输入起始IP: ", str, validate_ip)
+    end_ip = get_valid_input("请输入结束IP: ", str, validate_ip)
+    
+    ports_input = get_valid_input(f"请输入扫描端口列表（默认{DEFAULT_MULTI_PORTS}）: ", str, validate_port_list, default=DEFAULT_MULTI_PORTS)
+    ports = parse_port_list(ports_input)
+    
+    default_sentinels = ",".join(map(str, DEFAULT_SENTINEL_PORTS))
+    sentinel_input = get_valid_input(f"请输入哨兵端口（默认{default_sentinels}）: ", str, validate_port_list, default=default_sentinels)
+    sentinel_ports = parse_port_list(sentinel_input)
+    
+    thread_input = get_valid_input(f"请输入线程数（{MIN_THREAD}-{MAX_THREAD}，默认{DEFAULT_THREAD_NUM}）: ", int, lambda x: MIN_THREAD <= x <= MAX_THREAD)
+    thread_num = thread_input if thread_input is not None else DEFAULT_THREAD_NUM
+    
+    start_int = ip_to_int(start_ip)
+    end_int = ip_to_int(end_ip)
+    if start_int > end_int:
+        console.print("\n起始IP不能大于结束IP", style=ERROR_STYLE)
+        input("\n按回车键返回主菜单...")
+        return
+    
+    total_ips = end_int - start_int + 1
+    
+    console.print("\n")
+    console.print(Panel(
+        f"扫描范围: {start_ip} -> {end_ip}\n"
+        f"总IP数: {total_ips}\n"
+        f"扫描端口数: {len(ports)}\n"
+        f"哨兵端口: {', '.join(map(str, sentinel_ports))}\n"
+        f"线程数: {thread_num}\n"
+        f"MC扫描模式: {'开启' if mc_scan_mode else '关闭'}",
+        title="扫描配置确认",
+        border_style="yellow",
+        width=PANEL_WIDTH
+    ))
+    input("\n按回车键开始扫描...")
+    
+    global current_target, found_servers, live_hosts, prefilter_stats
+    current_target = 0
+    found_servers = []
+    live_hosts = []
+    prefilter_stats = {"sentinel_probes": 0, "dead_probes": 0}
+    
+    console.clear()
+    print_header()
+    progress_columns = (
+        SpinnerColumn("dots", style="green"),
+        TextColumn("[progress.description]{task.description}", style="white"),
+        BarColumn(bar_width=50, style=Style(bgcolor="#222222", color="green")),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%", style="green"),
+        TimeRemainingColumn(),
+        TextColumn("当前: {task.fields[current_target]}"),
+    )
+    
+    # 第一阶段：存活探测
+    discovery_start = time.time()
+    with Progress(*progress_columns, console=console, transient=True) as progress:
+        task_id = progress.add_task("存活探测...", total=total_ips, current_target="准备中...")
+        
+        threads = []
+        for _ in range(thread_num):
+            t = threading.Thread(target=discover_host_worker, args=(start_int, end_int, sentinel_ports, progress, task_id))
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        
+        for t in threads:
+            t.join()
+    discovery_time = time.time() - discovery_start
+    
+    live_hosts.sort(key=lambda host: ip_to_int(host[0]))
+    console.print(f"存活主机: {len(live_hosts)}/{total_ips}", style=INFO_STYLE)
+    
+    # 第二阶段：仅对存活主机扫描全部端口，跳过已确认关闭(RST)的哨兵端口
+    job_count = sum(len(ports) - len(closed_ports.intersection(ports)) for _, closed_ports in live_hosts)
+    current_target = 0
+    fanout_start = time.time()
+    if job_count:
+        with Progress(*progress_columns, console=console, transient=True) as progress:
+            task_id = progress.add_task("正在扫描...", total=job_count, current_target="准备中...")
+            
+            threads = []
+            for _ in range(min(thread_num, job_count)):
+                t = threading.Thread(target=scan_live_hosts_worker, args=(live_hosts, ports, progress, task_id))
+                t.daemon = True
+                t.start()
+                threads.append(t)
+            
+            for t in threads:
+                t.join()
+    fanout_time = time.time() - fanout_start
+    
+    # 统计：与不做预探测、逐端口扫描全部主机相比的连接次数和估计耗时
+    # 每次 connect_ex 计为一次探测；无预探测时：
+    #   无响应主机的每个端口在 scan_ip_port 中耗时 FAST_TIMEOUT；
+    #   存活主机上被跳过的哨兵端口按本次端口扫描的平均单次耗时估算
+    dead_hosts = total_ips - len(live_hosts)
+    naive_probes = total_ips * len(ports)
+    actual_probes = prefilter_stats["sentinel_probes"] + job_count
+    skipped_probes = naive_probes - job_count
+    skipped_live_probes = len(live_hosts) * len(ports) - job_count
+    job_time = fanout_time / job_count if job_count else FAST_TIMEOUT / thread_num
+    naive_time = (fanout_time + skipped_live_probes * job_time
+                  + dead_hosts * len(ports) * FAST_TIMEOUT / thread_num)
+    actual_time = discovery_time + fanout_time
+    saved_time = naive_time - actual_time
+    saved_probes = naive_probes - actual_probes
+    summary = (
+        f"存活主机: {len(live_hosts)}/{total_ips}\n"
+        f"哨兵探测数: {prefilter_stats['sentinel_probes']}（无响应主机探测 {prefilter_stats['dead_probes']}）\n"
+        f"端口扫描数: {job_count}（跳过 {skipped_probes}）\n"
+        f"总探测数: {actual_probes}（无预探测需 {naive_probes}，{'节省' if saved_probes >= 0 else '多耗'} {abs(saved_probes)}）\n"
+        f"实际耗时: {actual_time:.1f}s（存活探测 {discovery_time:.1f}s + 端口扫描 {fanout_time:.1f}s）\n"
+        f"估计{'节省' if saved_time >= 0 else '多耗'}时间: {abs(saved_time):.1f}s（无预探测估计 {naive_time:.1f}s）"
+    )
+    
+    show_scan_results(summary)
+
 def mc_server_status_check():
     """MC服务器状态检测功能"""
     console.clear()
@@ -587,13 +824,17 @@ def mc_server_status_check():
     
     input("\n按回车键返回主菜单...")
 
-def show_scan_results():
+def show_scan_results(summary=None):
     """显示扫描结果 - 减少界面刷新"""
     console.clear()
     print_header()
     console.print(Panel("扫描完成！", border_style="green", style=SUCCESS_STYLE, width=PANEL_WIDTH))
     console.print("\n")
     
+    if summary:
+        console.print(Panel(summary, title="扫描统计", border_style="cyan", width=PANEL_WIDTH))
+        console.print("\n")
+    
     if found_servers:
         table = Table(
             title="发现的服务器/端口",
@@ -636,6 +877,8 @@ def main():
             elif choice == 3:
                 mc_server_status_check()
             elif choice == 4:
+                multi_port_range_scan()
+            elif choice == 5:
                 console.clear()
                 print_header()
                 console.print("感谢使用，再见！", style=SUCCESS_STYLE)